@@ -1,14 +1,14 @@
 import os
-import json
+import logging
 import joblib
-from flask import Flask, render_template, request, jsonify, send_file
+import orjson
+from flask import Flask, Response, render_template, request, jsonify
 from werkzeug.utils import secure_filename
-from src.feature_extractor import extract_features
 from src.train_model import train_model
 from src.pdf_processor import process_pdf
-import tempfile
 import zipfile
-from io import BytesIO
+
+logging.basicConfig(level=logging.INFO)
 
 app = Flask(__name__)
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  
@@ -103,28 +103,9 @@ def process_pdf_endpoint():
         
         if not allowed_file(pdf_file.filename):
             return jsonify({'error': 'Invalid file type'}), 400
-
-        model_path = os.path.join(app.config['MODEL_FOLDER'], 'heading_model.pkl')
-        if not os.path.exists(model_path):
-            return jsonify({'error': 'No trained model found. Please train a model first.'}), 400
         
 
-        tmp_file_path = None
-        try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                pdf_file.save(tmp_file.name)
-                tmp_file_path = tmp_file.name
-
-            result = process_pdf(tmp_file_path, app.config['MODEL_FOLDER'])
-            
-        finally:
-
-            if tmp_file_path and os.path.exists(tmp_file_path):
-                try:
-                    os.unlink(tmp_file_path)
-                except OSError:
-
-                    pass
+        result = process_pdf(pdf_file.read())
         
         return jsonify(result)
         
@@ -143,36 +124,15 @@ def batch_process():
             return jsonify({'error': 'No files selected'}), 400
         
 
-        model_path = os.path.join(app.config['MODEL_FOLDER'], 'heading_model.pkl')
-        if not os.path.exists(model_path):
-            return jsonify({'error': 'No trained model found. Please train a model first.'}), 400
-        
         results = []
         
         for pdf_file in pdf_files:
             if pdf_file.filename and allowed_file(pdf_file.filename):
                 try:
-
-                    tmp_file_path = None
-                    try:
-                        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-                            pdf_file.save(tmp_file.name)
-                            tmp_file_path = tmp_file.name
-                        
-          
-                        result = process_pdf(tmp_file_path, app.config['MODEL_FOLDER'])
-                        result['filename'] = pdf_file.filename
-                        results.append(result)
-                        
-                    finally:
-
-                        if tmp_file_path and os.path.exists(tmp_file_path):
-                            try:
-                                os.unlink(tmp_file_path)
-                            except OSError:
-
-                                pass
-                        
+                    result = process_pdf(pdf_file.read())
+                    result['filename'] = pdf_file.filename
+                    results.append(result)
+                    
                 except Exception as e:
                     results.append({
                         'filename': pdf_file.filename,
@@ -184,6 +144,44 @@ def batch_process():
     except Exception as e:
         return jsonify({'error': f'Batch processing failed: {str(e)}'}), 500
 
+class _ZipChunkBuffer:
+    """Write-only file object that hands zipfile output back in chunks."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def _result_entry(result):
+    """Render a result as its (json filename, JSON bytes) zip entry."""
+    filename = result.get('filename', 'unknown.pdf')
+    json_filename = filename.replace('.pdf', '.json')
+
+    clean_result = {k: v for k, v in result.items() if k != 'filename'}
+    
+    return json_filename, orjson.dumps(clean_result, option=orjson.OPT_INDENT_2)
+
+def _iter_results_zip(results):
+    """Yield a zip archive of result JSON files one entry at a time."""
+    buffer = _ZipChunkBuffer()
+    # zipfile falls back to data descriptors on an unseekable stream, so
+    # each entry can be sent as soon as it is compressed
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for result in results:
+            zf.writestr(*_result_entry(result))
+            yield buffer.pop()
+    yield buffer.pop()
+
 @app.route('/download_results', methods=['POST'])
 def download_results():
     try:
@@ -194,24 +192,17 @@ def download_results():
             return jsonify({'error': 'No results to download'}), 400
         
 
-        memory_file = BytesIO()
-        with zipfile.ZipFile(memory_file, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for result in results:
-                filename = result.get('filename', 'unknown.pdf')
-                json_filename = filename.replace('.pdf', '.json')
-
-                clean_result = {k: v for k, v in result.items() if k != 'filename'}
-                
-                json_content = json.dumps(clean_result, indent=4, ensure_ascii=False)
-                zf.writestr(json_filename, json_content)
-        
-        memory_file.seek(0)
+        # Serialize every entry once up front, discarding the bytes, so bad
+        # results are reported by the except below rather than cutting off
+        # the stream; entries are serialized again one at a time while
+        # streaming, keeping memory bounded by the largest entry
+        for result in results:
+            _result_entry(result)
         
-        return send_file(
-            memory_file,
+        return Response(
+            _iter_results_zip(results),
             mimetype='application/zip',
-            as_attachment=True,
-            download_name='pdf_outline_results.zip'
+            headers={'Content-Disposition': 'attachment; filename=pdf_outline_results.zip'}
         )
         
     except Exception as e:
@@ -250,4 +241,5 @@ def model_status():
         return jsonify({'error': f'Status check failed: {str(e)}'}), 500
 
 if __name__ == '__main__':
+    # Development server only; serve with gunicorn in production (see README)
     app.run(host='0.0.0.0', port=5000)
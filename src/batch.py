@@ -0,0 +1,55 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from .pdf_processor import process_pdf
+
+def _process_one(pdf_path: str, page_workers: int) -> tuple:
+    """
+    Process a single PDF inside a worker process.
+    
+    Returns:
+        tuple: (result or {"error": message}, elapsed seconds)
+    """
+    start_time = time.time()
+    try:
+        return process_pdf(pdf_path, workers=page_workers), time.time() - start_time
+    except Exception as e:
+        return {"error": str(e)}, time.time() - start_time
+
+def process_pdfs(paths: list, num_workers: int = None):
+    """
+    Process several PDFs in a process pool, yielding each result as it completes.
+    
+    Args:
+        paths (list): Paths of the PDF files to process
+        num_workers (int): Worker processes; defaults to min(cpu count, 4)
+        
+    Yields:
+        tuple: (index into paths, result, processing time in seconds) in
+            completion order. Failed files, including ones whose worker
+            died, get a dict with only an "error" key.
+    """
+    paths = [str(p) for p in paths]
+    if not paths:
+        return
+    
+    cpu_count = os.cpu_count() or 1
+    if num_workers is None:
+        num_workers = min(cpu_count, 4)
+    num_workers = max(1, min(num_workers, len(paths)))
+    # Cores left over when there are fewer files than CPUs go to page extraction
+    page_workers = max(1, cpu_count // len(paths))
+    
+    start_time = time.time()
+    with ProcessPoolExecutor(max_workers=num_workers) as ex:
+        futs = {ex.submit(_process_one, path, page_workers): i
+                for i, path in enumerate(paths)}
+        for fut in as_completed(futs):
+            try:
+                result, elapsed = fut.result()
+            except BrokenProcessPool as e:
+                # A worker died (e.g. MuPDF crash or OOM kill); report the
+                # files it took down instead of aborting the whole batch
+                result, elapsed = {"error": f"Worker process failed: {str(e)}"}, time.time() - start_time
+            yield futs[fut], result, elapsed
@@ -1,116 +1,200 @@
 import fitz  # PyMuPDF
-import statistics
+import io
+import numpy as np
 import re
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 
-def extract_features(pdf_path: str) -> list:
+# Leading section number; the group captures any whitespace after it, so one
+# match answers both "has numbering" and "numbered heading" (number + space)
+_NUMBERING_RE = re.compile(r"^\d+(?:\.\d+)*(\s*)")
+
+# Default "dict" flags minus image extraction: image blocks carry no lines
+# and are skipped anyway, so don't pay to decode them
+_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+# Below this many pages per worker, process startup outweighs the gain
+_MIN_PAGES_PER_WORKER = 16
+
+def _open_document(pdf_source):
+    """Open a PDF from a file path, raw bytes or a BytesIO buffer."""
+    if isinstance(pdf_source, io.BytesIO):
+        pdf_source = pdf_source.getbuffer()
+    if isinstance(pdf_source, (bytes, bytearray, memoryview)):
+        return fitz.open(stream=pdf_source, filetype="pdf")
+    return fitz.open(pdf_source)
+
+def _stage_page(page) -> tuple:
+    """
+    Collects span font sizes and raw line records for a single page.
+    
+    Returns:
+        tuple: (font sizes, page width, line records sorted by vertical position)
+    """
+    page_sizes = []
+    lines_on_page = []
+    
+    # Skip interpreting the content stream of scans, image-only and
+    # vector-only pages: no fonts, no form XObjects, no text objects and no
+    # annotations or form fields (get_text renders their appearance streams).
+    # A missing font alone isn't enough, as MuPDF substitutes a fallback
+    # font for text that uses one absent from /Resources.
+    if (page.parent.is_pdf and page.first_annot is None and page.first_widget is None
+            and not page.get_fonts() and not page.get_xobjects()
+            and b"BT" not in page.read_contents()):
+        return page_sizes, page.rect.width, lines_on_page
+    
+    blocks = page.get_text("dict", flags=_TEXT_FLAGS)["blocks"]
+    
+    for block in blocks:
+        if "lines" in block:
+            for line in block["lines"]:
+                for span in line["spans"]:
+                    page_sizes.append(round(span['size'], 2))
+                
+                if not line['spans']: 
+                    continue
+                
+                # Combine all spans in the line to get complete text
+                line_text = "".join(s['text'] for s in line['spans']).strip()
+                if not line_text or len(line_text) < 2: 
+                    continue
+                
+                # Check if any span in the line is bold
+                is_bold = any("bold" in s['font'].lower() or "black" in s['font'].lower() 
+                              for s in line['spans'])
+                
+                # Get the largest font size in the line
+                max_font_size = max(s['size'] for s in line['spans'])
+                
+                lines_on_page.append((line['bbox'][1], line_text, round(max_font_size, 2),
+                                      is_bold, line['bbox'][0]))
+    
+    # Sort lines by vertical position
+    lines_on_page.sort(key=itemgetter(0))
+    return page_sizes, page.rect.width, lines_on_page
+
+def _stage_page_range(pdf_source, start: int, stop: int) -> list:
+    """Stages pages [start, stop) of a PDF; runs in a worker process."""
+    doc = _open_document(pdf_source)
+    try:
+        return [_stage_page(doc[i]) for i in range(start, stop)]
+    finally:
+        doc.close()
+
+def _stage_pages_parallel(pdf_source, page_count: int, n_workers: int) -> list:
     """
-    Extracts a feature vector for each line of text in a PDF.
+    Stages all pages using worker processes over contiguous page ranges.
+    
+    PyMuPDF holds the GIL and documents are not thread-safe, so each worker
+    process opens its own copy of the document.
+    """
+    if isinstance(pdf_source, io.BytesIO):
+        pdf_source = pdf_source.getvalue()
+    elif isinstance(pdf_source, (bytearray, memoryview)):
+        pdf_source = bytes(pdf_source)
+    
+    bounds = np.linspace(0, page_count, n_workers + 1).astype(int).tolist()
+    with ProcessPoolExecutor(max_workers=n_workers) as ex:
+        futs = [ex.submit(_stage_page_range, pdf_source, start, stop)
+                for start, stop in zip(bounds[:-1], bounds[1:])]
+        return [staged for fut in futs for staged in fut.result()]
+
+def extract_features(pdf_source, workers: int = 1) -> dict:
+    """
+    Extracts per-line features from a PDF as columns.
     
     Args:
-        pdf_path (str): Path to the PDF file
+        pdf_source (str | bytes | io.BytesIO): Path to the PDF file or its contents
+        workers (int): Worker processes for page extraction; only used for
+            documents with at least _MIN_PAGES_PER_WORKER pages per worker
         
     Returns:
-        list: List of dictionaries containing features for each line
+        dict: Feature columns with one entry per line; "text" is a list of
+            strings and every other column is a NumPy array. Empty if the
+            PDF has no text.
     """
     doc = None
     try:
-        doc = fitz.open(pdf_path)
+        doc = _open_document(pdf_source)
     except Exception as e:
         raise Exception(f"Failed to open PDF: {str(e)}")
     
-    all_lines_with_features = []
-
     try:
-        # First pass: Get document-level statistics
+        # Single pass: collect font sizes for document-level statistics and
+        # stage each page's line records, so get_text() runs once per page
+        page_count = len(doc)
+        n_workers = min(workers, page_count // _MIN_PAGES_PER_WORKER)
+        if n_workers > 1:
+            staged_pages = _stage_pages_parallel(pdf_source, page_count, n_workers)
+        else:
+            staged_pages = [_stage_page(page) for page in doc]
+        
         all_font_sizes = []
-        for page in doc:
-            blocks = page.get_text("dict")["blocks"]
-            for block in blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            all_font_sizes.append(round(span['size'], 2))
+        texts, sizes, bolds, x0s, y0s, page_nums, page_widths = [], [], [], [], [], [], []
+        for page_num, (page_sizes, page_width, lines_on_page) in enumerate(staged_pages):
+            all_font_sizes.extend(page_sizes)
+            for y0, line_text, size, is_bold, x0 in lines_on_page:
+                y0s.append(y0)
+                texts.append(line_text)
+                sizes.append(size)
+                bolds.append(is_bold)
+                x0s.append(x0)
+                page_nums.append(page_num + 1)
+                page_widths.append(page_width)
         
-        if not all_font_sizes:
-            return []
+        if not all_font_sizes or not texts:
+            return {}
         
-        median_font_size = statistics.median(all_font_sizes) if all_font_sizes else 10.0
-
-        # Second pass: Extract features for each line
-        for page_num, page in enumerate(doc):
-            page_width = page.rect.width
-            lines_on_page = []
-            blocks = page.get_text("dict")["blocks"]
-            
-            for block in blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        if not line['spans']: 
-                            continue
-                        
-                        # Combine all spans in the line to get complete text
-                        line_text = "".join(s['text'] for s in line['spans']).strip()
-                        if not line_text or len(line_text) < 2: 
-                            continue
-                        
-                        # Use the dominant span properties (usually the first one)
-                        span = line['spans'][0]
-                        
-                        # Check if any span in the line is bold
-                        is_bold = any("bold" in s['font'].lower() or "black" in s['font'].lower() 
-                                      for s in line['spans'])
-                        
-                        # Get the largest font size in the line
-                        max_font_size = max(s['size'] for s in line['spans'])
-                        
-                        lines_on_page.append({
-                            "text": line_text,
-                            "size": round(max_font_size, 2),
-                            "font": span['font'],
-                            "bold": is_bold,
-                            "x0": line['bbox'][0],
-                            "y0": line['bbox'][1],
-                            "page_num": page_num + 1
-                        })
-            
-            # Sort lines by vertical position
-            lines_on_page.sort(key=lambda x: x['y0'])
+        median_font_size = float(np.median(np.asarray(all_font_sizes)))
 
-            # Extract features for each line
-            for i, line in enumerate(lines_on_page):
-                space_before = line['y0'] - lines_on_page[i-1]['y0'] if i > 0 else 30
-                
-                # More sophisticated text analysis
-                text = line['text']
-                is_likely_heading = (
-                    line['size'] > median_font_size * 1.1 or  # Larger font
-                    line['bold'] or  # Bold text
-                    space_before > 15 or  # More space before
-                    bool(re.match(r"^\d+(\.\d+)*\s+", text)) or  # Numbered section
-                    text.isupper() or  # All caps
-                    (len(text.split()) < 10 and text.strip().endswith(':'))  # Short with colon
-                )
-                
-                feature_vector = {
-                    "text": text,
-                    "page_num": line['page_num'],
-                    "size_ratio": line['size'] / median_font_size if median_font_size > 0 else 1,
-                    "is_bold": line['bold'],
-                    "indentation": line['x0'],
-                    "is_centered": abs(line['x0'] - (page_width / 4)) < 50,
-                    "space_before": space_before,
-                    "word_count": len(text.split()),
-                    "has_numbering": bool(re.match(r"^\d+(\.\d+)*\s*", text)),
-                    "text_length": len(text),
-                    "is_uppercase": text.isupper(),
-                    "starts_with_capital": text[0].isupper() if text else False,
-                    "is_likely_heading": is_likely_heading,
-                    "relative_font_size": line['size'],
-                    "ends_with_colon": text.strip().endswith(':'),
-                }
-                all_lines_with_features.append(feature_vector)
+        # Build feature columns for all lines at once
+        page_num_arr = np.asarray(page_nums, dtype=np.int32)
+        size_arr = np.asarray(sizes, dtype=np.float64)
+        bold_arr = np.asarray(bolds, dtype=bool)
+        x0_arr = np.asarray(x0s, dtype=np.float64)
+        y0_arr = np.asarray(y0s, dtype=np.float64)
         
-        return all_lines_with_features
+        # Vertical gap to the previous line on the same page
+        space_before = np.full(len(texts), 30.0)
+        same_page = page_num_arr[1:] == page_num_arr[:-1]
+        space_before[1:][same_page] = (y0_arr[1:] - y0_arr[:-1])[same_page]
+        
+        word_count = np.fromiter((len(t.split()) for t in texts), dtype=np.int32, count=len(texts))
+        is_uppercase = np.fromiter((t.isupper() for t in texts), dtype=bool, count=len(texts))
+        ends_with_colon = np.fromiter((t.endswith(':') for t in texts), dtype=bool, count=len(texts))
+        numbering = [_NUMBERING_RE.match(t) for t in texts]
+        has_numbering = np.fromiter((m is not None for m in numbering), dtype=bool, count=len(texts))
+        numbered_heading = np.fromiter((m is not None and m.group(1) != '' for m in numbering),
+                                       dtype=bool, count=len(texts))
+        
+        # A line looks like a heading if any one cue holds, evaluated for all lines at once
+        is_likely_heading = (
+            (size_arr > median_font_size * 1.1) |  # Larger font
+            bold_arr |  # Bold text
+            (space_before > 15) |  # More space before
+            numbered_heading |  # Numbered section
+            is_uppercase |  # All caps
+            ((word_count < 10) & ends_with_colon)  # Short with colon
+        )
+        
+        return {
+            "text": texts,
+            "page_num": page_num_arr,
+            "size_ratio": size_arr / median_font_size if median_font_size > 0 else np.ones(len(texts)),
+            "is_bold": bold_arr,
+            "indentation": x0_arr,
+            "is_centered": np.abs(x0_arr - np.asarray(page_widths) / 4) < 50,
+            "space_before": space_before,
+            "word_count": word_count,
+            "has_numbering": has_numbering,
+            "text_length": np.fromiter((len(t) for t in texts), dtype=np.int32, count=len(texts)),
+            "is_uppercase": is_uppercase,
+            "starts_with_capital": np.fromiter((t[0].isupper() for t in texts), dtype=bool, count=len(texts)),
+            "is_likely_heading": is_likely_heading,
+            "relative_font_size": size_arr,
+            "ends_with_colon": ends_with_colon,
+        }
         
     finally:
         # Ensure the document is always closed
@@ -121,6 +205,24 @@ def extract_features(pdf_path: str) -> list:
                 # Ignore any errors when closing
                 pass
 
+def build_feature_matrix(line_features: dict, feature_keys: list) -> np.ndarray:
+    """
+    Stacks feature columns into a float32 matrix for the classifier.
+    
+    Args:
+        line_features (dict): Feature columns as returned by extract_features
+        feature_keys (list): Feature key names, in model column order
+        
+    Returns:
+        np.ndarray: Array of shape (lines, features); missing keys are zero
+    """
+    n_lines = len(line_features.get('text', []))
+    X = np.zeros((n_lines, len(feature_keys)), dtype=np.float32)
+    for j, key in enumerate(feature_keys):
+        if key in line_features:
+            X[:, j] = line_features[key]
+    return X
+
 def get_feature_keys():
     """
     Returns the list of feature keys used for training.
@@ -1,42 +1,96 @@
 import os
+import io
 import re
-import joblib
+import hashlib
+import logging
+import warnings
+import numpy as np
+from collections import Counter
+from operator import itemgetter
+from joblib import Memory
+from . import feature_extractor
 from .feature_extractor import extract_features
 
-def process_pdf(pdf_path: str, model_dir: str) -> dict:
+logger = logging.getLogger(__name__)
+
+_NUMBERED_RE = re.compile(r"^\d+(?:\.\d+)*\s+\w+")
+
+_NON_HEADING_PREFIXES = ('copyright', 'version', 'page', '©', 'www.', 'http')
+
+# Keywords that mark a colon-terminated line as an H3
+_KEYWORDS_RE = re.compile(r"for each|timeline|result|phase")
+
+def _pdf_digest(pdf_source) -> str:
+    """Hash the PDF contents for use as a cache key."""
+    if isinstance(pdf_source, io.BytesIO):
+        pdf_source = pdf_source.getbuffer()
+    if not isinstance(pdf_source, (bytes, bytearray, memoryview)):
+        with open(pdf_source, 'rb') as f:
+            pdf_source = f.read()
+    return hashlib.blake2b(pdf_source, digest_size=16).hexdigest()
+
+def _extract_outline(pdf_digest: str, rules_version: str, pdf_source, workers: int) -> dict:
+    """Extract features and build the outline; the first two arguments only key the cache."""
+    # Extract features from PDF
+    try:
+        line_features = extract_features(pdf_source, workers)
+    except Exception as e:
+        raise Exception(f"Failed to extract features from PDF: {str(e)}")
+    
+    return assemble_result(line_features)
+
+# Optional on-disk result cache, enabled by pointing PDF_CACHE at a directory
+# (e.g. /dev/shm/pdf_cache). Entries are keyed on a blake2b digest of the PDF
+# rather than joblib's md5 of the raw bytes, plus a hash of the extraction and
+# heading rule sources so edits to either invalidate old results.
+_cache_dir = os.environ.get('PDF_CACHE')
+if _cache_dir:
+    _rules_hash = hashlib.blake2b(digest_size=16)
+    for _source_path in (__file__, feature_extractor.__file__):
+        with open(_source_path, 'rb') as _f:
+            _rules_hash.update(_f.read())
+    _RULES_VERSION = _rules_hash.hexdigest()
+    _cached_extract_outline = Memory(_cache_dir, verbose=0).cache(
+        _extract_outline, ignore=['pdf_source', 'workers'])
+else:
+    _cached_extract_outline = None
+
+def process_pdf(pdf_source, model_dir: str = None, workers: int = 1) -> dict:
     """
     Process a PDF file to extract its outline structure.
     
     Args:
-        pdf_path (str): Path to the PDF file to process
-        model_dir (str): Directory containing trained model files
+        pdf_source (str | bytes | io.BytesIO): Path to the PDF file or its contents
+        model_dir (str): Deprecated and ignored; headings come from the rules
+            in assemble_result, so no trained model is loaded
+        workers (int): Worker processes for page extraction on large PDFs
         
     Returns:
         dict: Extracted outline structure with title and outline
     """
-    # Load trained model and artifacts
-    try:
-        model_path = os.path.join(model_dir, 'heading_model.pkl')
-        encoder_path = os.path.join(model_dir, 'label_encoder.pkl')
-        features_path = os.path.join(model_dir, 'feature_keys.pkl')
-        
-        model = joblib.load(model_path)
-        encoder = joblib.load(encoder_path)
-        feature_keys = joblib.load(features_path)
-        
-    except FileNotFoundError as e:
-        raise FileNotFoundError(f"Model files not found: {str(e)}")
-    except OSError as e:
-        raise OSError(f"Failed to load model: {str(e)}")
-    except ValueError as e:
-        raise ValueError(f"Prediction failed: {str(e)}")
+    if model_dir is not None:
+        warnings.warn("process_pdf() no longer uses a trained model; the model_dir "
+                      "argument is ignored and will be removed", DeprecationWarning, stacklevel=2)
+    
+    if _cached_extract_outline is None:
+        return _extract_outline(None, None, pdf_source, workers)
     
-    # Extract features from PDF
     try:
-        line_features = extract_features(pdf_path)
-    except Exception as e:
+        pdf_digest = _pdf_digest(pdf_source)
+    except OSError as e:
         raise Exception(f"Failed to extract features from PDF: {str(e)}")
+    return _cached_extract_outline(pdf_digest, _RULES_VERSION, pdf_source, workers)
+
+def assemble_result(line_features: dict) -> dict:
+    """
+    Label each line with the heading rules and build the outline.
     
+    Args:
+        line_features (dict): Feature columns as returned by extract_features
+        
+    Returns:
+        dict: Extracted outline structure with title and outline
+    """
     if not line_features:
         return {
             "title": "Empty or unreadable PDF",
@@ -44,127 +98,114 @@ def process_pdf(pdf_path: str, model_dir: str) -> dict:
             "error": "No text content found in PDF"
         }
     
-    # Prepare features for prediction
-    X_predict = []
-    for line in line_features:
-        feature_vector = []
-        for key in feature_keys:
-            value = line.get(key, 0)
-            # Convert boolean to int for consistency
-            if isinstance(value, bool):
-                value = int(value)
-            feature_vector.append(value)
-        X_predict.append(feature_vector)
-    
-    # Make predictions and apply heuristic rules
-    try:
-        predicted_labels_encoded = model.predict(X_predict)
-        ml_predictions = encoder.inverse_transform(predicted_labels_encoded)
-    except Exception as e:
-        raise Exception(f"Prediction failed: {str(e)}")
-    
-    # Debug: print prediction results
-    # print(f"Processing {len(ml_predictions)} text elements...")
-    # print(f"ML model predictions: {label_counts}")
-    label_counts = {}
-    for label in ml_predictions:
-        label_counts[label] = label_counts.get(label, 0) + 1
-    # print(f"ML model predictions: {label_counts}")
+    texts = line_features['text']
+    logger.debug("Processing %d text elements...", len(texts))
+    page_nums = line_features['page_num'].tolist()
+    bolds = line_features['is_bold'].tolist()
     
-    # Apply heuristic rules to improve predictions
+    # Label each line with the heading rules
     final_predictions = []
-    all_font_sizes = [line.get('relative_font_size', 10) for line in line_features]
-    median_font_size = sorted(all_font_sizes)[len(all_font_sizes)//2] if all_font_sizes else 12
-    
-    for i, line in enumerate(line_features):
-        text = line['text'].strip()
-        ml_label = ml_predictions[i]
+    # Upper median via O(N) selection (same value as sorted(...)[n // 2])
+    all_font_sizes = line_features['relative_font_size']
+    mid = len(all_font_sizes) // 2
+    median_font_size = float(np.partition(all_font_sizes, mid)[mid]) if len(all_font_sizes) else 12
+    
+    # Numeric predicates evaluated for all lines at once; only the string
+    # checks are left to the per-line loop
+    large_fonts = (all_font_sizes > median_font_size * 1.4).tolist()
+    spaced_before = (line_features['space_before'] > 15).tolist()
+    first_page = (line_features['page_num'] == 1).tolist()
+    
+    # Per-line string measures already computed by extract_features, whose
+    # texts are stripped; only checks it doesn't provide are done here
+    word_counts = line_features['word_count'].tolist()
+    text_lengths = line_features['text_length'].tolist()
+    uppers = line_features['is_uppercase'].tolist()
+    
+    for i, text in enumerate(texts):
         
-        # Much more conservative heuristic rules
-        is_large_font = line.get('relative_font_size', 10) > median_font_size * 1.4
-        is_bold = line.get('is_bold', False)
-        is_numbered = bool(re.match(r"^\d+(\.\d+)*\s+\w+", text))  # Number + space + word
-        has_colon = text.strip().endswith(':') and not text.strip().endswith('::')
-        is_reasonable_length = 5 <= len(text) <= 200  # Must be substantial but not too long
-        is_reasonable_words = 1 <= len(text.split()) <= 20
-        has_space_before = line.get('space_before', 0) > 15
-        is_first_page = line.get('page_num', 1) == 1
-        is_appendix = text.lower().startswith('appendix')
+        text_lower = text.lower()
+        n_words = word_counts[i]
+        n_chars = text_lengths[i]
         
-        # Strong filters for non-headings
-        is_page_number = text.isdigit() and len(text) <= 3
-        is_single_char = len(text.strip()) <= 2
-        is_copyright_etc = text.lower().startswith(('copyright', 'version', 'page', '©', 'www.', 'http'))
-        is_incomplete = text.endswith(('-', '–')) or len(text.split()) == 1 and len(text) < 8
-        has_lowercase_start = text and text[0].islower() and not is_numbered
-        
-        if (is_page_number or is_single_char or is_copyright_etc or 
-            is_incomplete or has_lowercase_start or not is_reasonable_length):
+        # Strong filters for non-headings, checked first since most lines are
+        # body text. A lowercase first character can never start a numbered
+        # heading, so the regex isn't needed for that check.
+        if ((text.isdigit() and n_chars <= 3) or  # Page number
+                n_chars <= 2 or  # Single character
+                text_lower.startswith(_NON_HEADING_PREFIXES) or
+                text.endswith(('-', '–')) or (n_words == 1 and n_chars < 8) or  # Incomplete
+                text[0].islower() or
+                not 5 <= n_chars <= 200):  # Must be substantial but not too long
             final_predictions.append('Body Text')
+            continue
+        
+        # Much more conservative heuristic rules
+        is_large_font = large_fonts[i]
+        is_bold = bolds[i]
+        is_numbered = _NUMBERED_RE.match(text) is not None  # Number + space + word
+        has_colon = text.endswith(':') and not text.endswith('::')
+        is_reasonable_words = 1 <= n_words <= 20
+        has_space_before = spaced_before[i]
+        is_first_page = first_page[i]
+        is_appendix = text_lower.startswith('appendix')
+        
         # Title detection - very selective for first page
-        elif (is_first_page and i < 3 and len(text) > 20 and 
-              (is_large_font or is_bold) and ':' in text and 
-              not text.lower().startswith(('copyright', 'version'))):
+        if (is_first_page and i < 3 and n_chars > 20 and 
+                (is_large_font or is_bold) and ':' in text):
             final_predictions.append('Title')
         # H1 detection - major sections only
         elif ((is_large_font and is_bold and is_reasonable_words) or 
               (is_appendix and is_bold and is_reasonable_words) or
-              (text.isupper() and is_reasonable_words and has_space_before)):
+              (uppers[i] and is_reasonable_words and has_space_before)):
             final_predictions.append('H1')
         # H2 detection - clear subsections
         elif ((is_bold and has_space_before and is_reasonable_words and 
                (has_colon or is_numbered)) or
-              (is_numbered and is_bold and len(text.split()) >= 3)):
+              (is_numbered and is_bold and n_words >= 3)):
             final_predictions.append('H2')
         # H3 detection - numbered sub-subsections or specific patterns
-        elif ((is_numbered and '.' in text and text.count('.') >= 2 and len(text.split()) >= 2) or
-              (has_colon and is_reasonable_words and len(text.split()) >= 2 and 
-               any(word in text.lower() for word in ['for each', 'timeline', 'result', 'phase']))):
+        elif ((is_numbered and '.' in text and text.count('.') >= 2 and n_words >= 2) or
+              (has_colon and is_reasonable_words and n_words >= 2 and 
+               _KEYWORDS_RE.search(text_lower) is not None)):
             final_predictions.append('H3')
         # H4 detection - very specific patterns
-        elif (text.startswith('For each') and has_colon and len(text.split()) >= 3):
+        elif (text.startswith('For each') and has_colon and n_words >= 3):
             final_predictions.append('H4')
         else:
             final_predictions.append('Body Text')
     
-    # Debug: print final predictions
-    # print(f"Final predictions after heuristics: {final_label_counts}")
-    final_label_counts = {}
-    for label in final_predictions:
-        final_label_counts[label] = final_label_counts.get(label, 0) + 1
-    # print(f"Final predictions after heuristics: {final_label_counts}")
+    # Debug: log final predictions
+    if logger.isEnabledFor(logging.DEBUG):
+        final_label_counts = dict(Counter(final_predictions))
+        logger.debug("Final predictions after heuristics: %s", final_label_counts)
     
-    # Extract title and outline
+    # Extract title and outline in a single pass; the first 'Title' wins
     title = "Untitled Document"
     outline = []
     found_title = False
-    
-    # First pass: look for title
-    for i, label in enumerate(final_predictions):
-        if label == 'Title':
-            title = line_features[i]['text'].strip()
-            found_title = True
-            # print(f"Found title: '{title}'")
-            break
-    
-    # Second pass: extract outline items and clean them up
     seen_texts = set()  # Track to avoid duplicates
     for i, label in enumerate(final_predictions):
-        if label.startswith('H'):
-            text = line_features[i]['text'].strip()
+        if label == 'Title':
+            if not found_title:
+                title = texts[i]
+                found_title = True
+                logger.debug("Found title: '%s'", title)
+                # Don't repeat the title in the outline if a heading before it matched
+                if title in seen_texts:
+                    outline = [item for item in outline if item['text'] != title]
+                    seen_texts.discard(title)
+        elif label.startswith('H'):
+            text = texts[i]
             # Don't add the title text again if we already found it
             # Also avoid duplicates and very similar entries
-            if not (found_title and text == title) and text not in seen_texts:
-                # Clean up the text
-                clean_text = text.strip()
-                if clean_text and len(clean_text) > 2:  # Ensure meaningful content
-                    outline.append({
-                        "level": label,
-                        "text": clean_text,
-                        "page": line_features[i]['page_num']
-                    })
-                    seen_texts.add(text)
-                    # print(f"Added to outline: {label} - '{clean_text}' (page {line_features[i]['page_num']})")
+            if text_lengths[i] > 2 and not (found_title and text == title) and text not in seen_texts:
+                outline.append({
+                    "level": label,
+                    "text": text,
+                    "page": page_nums[i]
+                })
+                seen_texts.add(text)
     
     # If no title was found, try to construct one from first few text elements or first H1
     if not found_title:
@@ -174,12 +215,11 @@ def process_pdf(pdf_path: str, model_dir: str) -> dict:
             if h1_items:
                 title = h1_items[0]['text']
                 outline = [item for item in outline if item['text'] != title]
-                # print(f"Using first H1 as title: '{title}'")
+                logger.debug("Using first H1 as title: '%s'", title)
         else:
             # Try to construct title from first few meaningful text lines
             meaningful_lines = []
-            for line in line_features[:10]:  # Check first 10 lines
-                text = line['text'].strip()
+            for text in texts[:10]:  # Check first 10 lines
                 if len(text) > 10 and not text.lower().startswith(('copyright', 'page', 'version')):
                     meaningful_lines.append(text)
                     if len(meaningful_lines) >= 2:
@@ -187,10 +227,12 @@ def process_pdf(pdf_path: str, model_dir: str) -> dict:
             
             if meaningful_lines:
                 title = ' '.join(meaningful_lines[:2])
-                # print(f"Constructed title from text: '{title}'")
+                logger.debug("Constructed title from text: '%s'", title)
+    
+    logger.debug("Added %d outline items", len(outline))
     
-    # Sort outline by page number and level
-    outline.sort(key=lambda x: (x['page'], x['level']))
+    # Sort outline by page number and level (levels are H1-H4, so string order is rank order)
+    outline.sort(key=itemgetter('page', 'level'))
     
     result = {
         "title": title,
@@ -199,8 +241,8 @@ def process_pdf(pdf_path: str, model_dir: str) -> dict:
     
     # Add some metadata
     result["metadata"] = {
-        "total_pages": max([line['page_num'] for line in line_features]) if line_features else 0,
-        "total_text_lines": len(line_features),
+        "total_pages": page_nums[-1],  # lines are emitted in page order
+        "total_text_lines": len(texts),
         "outline_items": len(outline)
     }
     
@@ -1,11 +1,12 @@
 import os
 import json
 import joblib
-from sklearn.ensemble import RandomForestClassifier
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, accuracy_score
-from .feature_extractor import extract_features, get_feature_keys
+from .feature_extractor import extract_features, build_feature_matrix, get_feature_keys
 import logging
 import sys
 
@@ -59,52 +60,42 @@ def train_model(pdf_path: str, json_path: str, model_output_dir: str) -> dict:
     if 'outline' in ground_truth:
         for item in ground_truth['outline']:
             truth_lookup[item['text'].strip()] = item['level']
-            logger.info(f"Added {item['level']}: '{item['text'].strip()}'")
+            logger.debug("Added %s: '%s'", item['level'], item['text'].strip())
     
     logger.info(f"Total ground truth items: {len(truth_lookup)}")
     logger.info(f"Ground truth labels: {set(truth_lookup.values())}")
     
     # Debug: Show some sample text from PDF
     logger.info("Sample PDF text lines:")
-    for i, line in enumerate(all_lines_features[:10]):
-        logger.info(f"  {i+1}: '{line['text']}'")
-    if len(all_lines_features) > 10:
-        logger.info(f"  ... and {len(all_lines_features) - 10} more lines")
+    texts = all_lines_features['text']
+    for i, text in enumerate(texts[:10]):
+        logger.info(f"  {i+1}: '{text}'")
+    if len(texts) > 10:
+        logger.info(f"  ... and {len(texts) - 10} more lines")
     
     # Prepare training data
     feature_keys = get_feature_keys()
-    X_train = []
+    X_train = build_feature_matrix(all_lines_features, feature_keys)
     y_train = []
     
     logger.info("Creating training dataset...")
     matched_count = 0
-    for line_features in all_lines_features:
-        text = line_features["text"].strip()
+    for raw_text in texts:
+        text = raw_text.strip()
         label = truth_lookup.get(text, 'Body Text')
         
         if label != 'Body Text':
             matched_count += 1
-            logger.info(f"MATCHED: '{text}' -> {label}")
         
-        # Extract feature vector
-        feature_vector = []
-        for key in feature_keys:
-            value = line_features.get(key, 0)
-            # Convert boolean to int for Random Forest
-            if isinstance(value, bool):
-                value = int(value)
-            feature_vector.append(value)
-        
-        X_train.append(feature_vector)
         y_train.append(label)
     
-    logger.info(f"Matched {matched_count} out of {len(all_lines_features)} text lines with ground truth")
+    logger.info(f"Matched {matched_count} out of {len(texts)} text lines with ground truth")
     
     # Debug: Show potential near matches
     if matched_count == 0:
         logger.info("\nNo exact matches found. Checking for potential near matches...")
         ground_truth_texts = set(truth_lookup.keys())
-        pdf_texts = set(line['text'].strip() for line in all_lines_features)
+        pdf_texts = set(text.strip() for text in texts)
         
         logger.info("First 10 ground truth texts:")
         for i, text in enumerate(list(ground_truth_texts)[:10]):
@@ -119,17 +110,15 @@ def train_model(pdf_path: str, json_path: str, model_output_dir: str) -> dict:
     
     logger.info(f"Training dataset created with {len(X_train)} samples")
     
-    # Check label distribution
-    label_counts = {}
-    for label in y_train:
-        label_counts[label] = label_counts.get(label, 0) + 1
-    logger.info(f"Label distribution: {label_counts}")
-    
     # Encode labels
     logger.info("Encoding labels...")
     encoder = LabelEncoder()
     y_train_encoded = encoder.fit_transform(y_train)
     
+    # Check label distribution (labels are now integer codes into classes_)
+    label_counts = dict(zip(encoder.classes_.tolist(), np.bincount(y_train_encoded).tolist()))
+    logger.info(f"Label distribution: {label_counts}")
+    
     # Split data for validation
     if len(X_train) > 10:  # Only split if we have enough data
         X_train_split, X_val_split, y_train_split, y_val_split = train_test_split(
@@ -140,13 +129,15 @@ def train_model(pdf_path: str, json_path: str, model_output_dir: str) -> dict:
         y_train_split, y_val_split = y_train_encoded, y_train_encoded
     
     # Train model
-    logger.info("Training Random Forest model...")
-    model = RandomForestClassifier(
-        n_estimators=100,
-        random_state=42,
-        max_depth=10,
-        min_samples_split=2,
-        min_samples_leaf=1
+    logger.info("Training gradient boosting model...")
+    # Binned GBDT: splits are searched over 8-bit feature histograms, and
+    # trees are capped at depth 6 rather than the old forest's 10
+    model = HistGradientBoostingClassifier(
+        max_iter=100,
+        max_depth=6,
+        learning_rate=0.1,
+        early_stopping=True,
+        random_state=42
     )
     
     model.fit(X_train_split, y_train_split)
@@ -92,7 +92,7 @@ class PDFOutlineExtractor {
                             No Model Trained
                         </span>
                         <div class="mt-2">
-                            <small class="text-muted">Please train a model first using the training section above</small>
+                            <small class="text-muted">Not required for processing: outlines come from the built-in heading rules</small>
                         </div>
                     </div>
                     <button class="btn btn-outline-primary btn-sm" onclick="extractor.checkModelStatus()">
@@ -103,8 +103,8 @@ class PDFOutlineExtractor {
             `;
             
             
-            document.getElementById('process-single-btn').disabled = true;
-            document.getElementById('process-batch-btn').disabled = true;
+            document.getElementById('process-single-btn').disabled = false;
+            document.getElementById('process-batch-btn').disabled = false;
         }
     }
 
@@ -0,0 +1,52 @@
+import io
+import os
+import sys
+import unittest
+import zipfile
+
+import orjson
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app
+
+class DownloadResultsTest(unittest.TestCase):
+    """Round trip and error paths of the streamed /download_results zip."""
+
+    def setUp(self):
+        self.client = app.test_client()
+
+    def test_round_trip(self):
+        results = [
+            {'filename': 'first.pdf', 'title': 'Résumé', 'outline': [{'level': 'H1', 'text': 'Intro', 'page': 1}]},
+            {'filename': 'second.pdf', 'title': 'Second', 'outline': []},
+            {'title': 'No name', 'outline': []},
+        ]
+        response = self.client.post('/download_results', json={'results': results})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/zip')
+        with zipfile.ZipFile(io.BytesIO(response.data)) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.namelist(), ['first.json', 'second.json', 'unknown.json'])
+            for name, result in zip(zf.namelist(), results):
+                expected = {k: v for k, v in result.items() if k != 'filename'}
+                self.assertEqual(orjson.loads(zf.read(name)), expected)
+
+    def test_empty_results(self):
+        response = self.client.post('/download_results', json={'results': []})
+        self.assertEqual(response.status_code, 400)
+
+    def test_unserializable_result_reports_error(self):
+        response = self.client.post('/download_results',
+                                    json={'results': [{'filename': 'a.pdf'}, {'filename': 'b.pdf', 'big': 2 ** 70}]})
+        self.assertEqual(response.status_code, 500)
+        self.assertIn('Download failed', response.get_json()['error'])
+
+    def test_non_string_filename_reports_error(self):
+        response = self.client.post('/download_results', json={'results': [{'filename': 5}]})
+        self.assertEqual(response.status_code, 500)
+        self.assertIn('Download failed', response.get_json()['error'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import batch
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_PDFS = [
+    os.path.join(REPO_ROOT, 'input', 'E0H1CM114.pdf'),
+    os.path.join(REPO_ROOT, 'uploads', 'E0CCG5S312.pdf'),
+]
+
+_real_process_pdf = batch.process_pdf
+
+def _crash_on_marker(pdf_path, workers=1):
+    """Stands in for process_pdf; kills the worker for the marked file."""
+    if pdf_path.endswith('crash.pdf'):
+        os._exit(1)
+    return _real_process_pdf(pdf_path, workers=workers)
+
+class ProcessPdfsTest(unittest.TestCase):
+    """process_pdfs yields every input once, with failures as error dicts."""
+
+    def test_missing_file_is_reported_per_file(self):
+        paths = [SAMPLE_PDFS[0], os.path.join(REPO_ROOT, 'input', 'missing.pdf'), SAMPLE_PDFS[1]]
+        results = {index: result for index, result, _ in batch.process_pdfs(paths, num_workers=2)}
+
+        self.assertEqual(sorted(results), [0, 1, 2])
+        self.assertEqual(list(results[1]), ['error'])
+        for index in (0, 2):
+            self.assertIn('metadata', results[index])
+            self.assertGreater(results[index]['metadata']['total_pages'], 0)
+
+    def test_no_paths(self):
+        self.assertEqual(list(batch.process_pdfs([])), [])
+
+    @unittest.skipUnless(multiprocessing.get_start_method() == 'fork',
+                         "workers only see the patched process_pdf when forked")
+    def test_dead_worker_does_not_abort_batch(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        crash_path = os.path.join(tmp_dir, 'crash.pdf')
+        shutil.copy(SAMPLE_PDFS[0], crash_path)
+
+        with mock.patch.object(batch, 'process_pdf', _crash_on_marker):
+            # A single worker runs the files in order, so the first one
+            # finishes before the crash takes the pool down
+            outcomes = list(batch.process_pdfs([SAMPLE_PDFS[0], crash_path], num_workers=1))
+
+        results = {index: result for index, result, _ in outcomes}
+        self.assertEqual(sorted(results), [0, 1])
+        self.assertIn('metadata', results[0])
+        self.assertIn('Worker process failed', results[1]['error'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import sys
+import unittest
+
+import fitz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.feature_extractor import extract_features
+
+def _minimal_pdf(content: bytes) -> bytes:
+    """Builds a one-page PDF with an empty /Resources dictionary."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << >> /Contents 4 0 R >>",
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+    ]
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % (i + 1) + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return out
+
+class PageSkipTest(unittest.TestCase):
+    """Pages without fonts must only be skipped when they really hold no text."""
+
+    def test_text_with_font_missing_from_resources(self):
+        pdf = _minimal_pdf(b"BT /F1 24 Tf 72 720 Td (Hello Heading Text) Tj ET")
+        self.assertEqual(extract_features(pdf)['text'], ['Hello Heading Text'])
+
+    def test_annotation_and_form_field_text(self):
+        doc = fitz.open()
+        page = doc.new_page()
+        page.add_freetext_annot(fitz.Rect(72, 72, 400, 110), "Annotated Heading Text", fontsize=14)
+        widget = fitz.Widget()
+        widget.field_type = fitz.PDF_WIDGET_TYPE_TEXT
+        widget.field_name = "field"
+        widget.rect = fitz.Rect(72, 200, 400, 230)
+        widget.field_value = "Filled Form Field Value"
+        widget.text_fontsize = 12
+        page.add_widget(widget)
+        pdf = doc.tobytes()
+
+        self.assertEqual(extract_features(pdf)['text'],
+                         ['Annotated Heading Text', 'Filled Form Field Value'])
+
+    def test_vector_only_page_has_no_text(self):
+        doc = fitz.open()
+        page = doc.new_page()
+        shape = page.new_shape()
+        for i in range(100):
+            shape.draw_line((i, 0), (0, i))
+        shape.finish()
+        shape.commit()
+
+        self.assertEqual(extract_features(doc.tobytes()), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import importlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src import pdf_processor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_PDF = os.path.join(REPO_ROOT, 'uploads', 'E0CCG5S312.pdf')
+OTHER_PDF = os.path.join(REPO_ROOT, 'input', 'E0H1CM114.pdf')
+
+class PdfCacheTest(unittest.TestCase):
+    """The PDF_CACHE result cache is keyed on PDF contents and rule sources."""
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        with mock.patch.dict(os.environ, {'PDF_CACHE': self.cache_dir}):
+            self.module = importlib.reload(pdf_processor)
+        # Leave the module uncached for other tests
+        self.addCleanup(importlib.reload, pdf_processor)
+
+        self.extract = mock.patch.object(self.module, 'extract_features',
+                                         wraps=self.module.extract_features).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_same_contents_hit_regardless_of_source_type(self):
+        with open(SAMPLE_PDF, 'rb') as f:
+            pdf_bytes = f.read()
+
+        first = self.module.process_pdf(SAMPLE_PDF)
+        self.assertEqual(self.extract.call_count, 1)
+        for source in (pdf_bytes, io.BytesIO(pdf_bytes), SAMPLE_PDF):
+            self.assertEqual(self.module.process_pdf(source), first)
+        self.assertEqual(self.extract.call_count, 1)
+
+    def test_different_contents_miss(self):
+        self.module.process_pdf(SAMPLE_PDF)
+        self.module.process_pdf(OTHER_PDF)
+        self.assertEqual(self.extract.call_count, 2)
+
+    def test_rule_source_change_invalidates(self):
+        self.module.process_pdf(SAMPLE_PDF)
+        with mock.patch.object(self.module, '_RULES_VERSION', 'edited-rules'):
+            self.module.process_pdf(SAMPLE_PDF)
+        self.assertEqual(self.extract.call_count, 2)
+
+    def test_rules_version_tracks_module_sources(self):
+        self.assertNotEqual(self.module._RULES_VERSION, '')
+        with mock.patch.dict(os.environ, {'PDF_CACHE': self.cache_dir}):
+            self.assertEqual(importlib.reload(pdf_processor)._RULES_VERSION, self.module._RULES_VERSION)
+
+    def test_cache_disabled_without_env(self):
+        with mock.patch.dict(os.environ):
+            os.environ.pop('PDF_CACHE', None)
+            self.assertIsNone(importlib.reload(pdf_processor)._cached_extract_outline)
+
+if __name__ == '__main__':
+    unittest.main()